@@ -0,0 +1,406 @@
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import tempfile
+import argparse
+
+# scripts/ altındaki modüller birbirini doğrudan import eder
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# Backend'ler (elasticsearch, PyPDF2, requests, fpdf) sadece gereken alt komutta
+# import edilir. search, çalışan bir daemon varsa Unix socket üzerinden ona sorulur.
+# Socket kullanıcıya özel bir dizinde durur ($XDG_RUNTIME_DIR veya 0700 izinli
+# geçici dizin); başka bir kullanıcı aynı yolu önceden bağlayıp istekleri alamaz.
+SOCKET_DIR = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+    tempfile.gettempdir(), f"wikipedia_search_{os.getuid()}"
+)
+SOCKET_PATH = os.environ.get("WIKI_SEARCH_SOCKET") or os.path.join(SOCKET_DIR, "wikipedia_search.sock")
+BACKENDS = ["sqlite", "elasticsearch"]
+CONNECTION_TIMEOUT = 10
+
+
+def searcher_config(backend):
+    """Searcher'ın veritabanı yolları ve ES adresi (daemon başka bir dizinde çalışabilir, yollar mutlak)"""
+    if backend == "sqlite":
+        from elastic_search import DB_PATH
+        return {"db_path": os.path.abspath(DB_PATH)}
+
+    from main import ES_HOST, VOCAB_DB_PATH, PERCOLATOR_DB_PATH
+    return {
+        "es_host": ES_HOST,
+        "vocab_db_path": os.path.abspath(VOCAB_DB_PATH),
+        "percolator_db_path": os.path.abspath(PERCOLATOR_DB_PATH)
+    }
+
+
+def get_searcher(backend, profile="default", config=None):
+    """Backend'in searcher sınıfını ilk kullanımda import et"""
+    config = config or searcher_config(backend)
+    if backend == "sqlite":
+        from elastic_search import WikipediaPDFSearcher
+        return WikipediaPDFSearcher(**config)
+
+    from main import WikipediaPDFSearcher
+    return WikipediaPDFSearcher(profile=profile, **config)
+
+
+def search_results(searcher, backend, keyword, limit):
+    """Arama yap ve JSON'a çevrilebilir sonuç döndür"""
+    if backend == "sqlite":
+        return searcher.search_keyword(keyword, limit=limit)
+
+    response = searcher.search_keyword(keyword, size=limit)
+    if response is None:
+        return None
+    return getattr(response, "body", response)
+
+
+# --- Daemon -------------------------------------------------------------------
+
+def ensure_private_dir(directory):
+    """Dizini 0700 oluştur; başka kullanıcıya aitse veya başkalarına açıksa reddet"""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid()
+            or info.st_mode & 0o077):
+        raise PermissionError(f"Socket dizini bu kullanıcıya özel değil: {directory}")
+
+
+def owned_socket(socket_path):
+    """Yol bu kullanıcıya ait bir Unix socket mi (sahte daemon'a bağlanmamak için)"""
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+class SearchDaemon:
+    """Searcher'ları sıcak tutan, satır bazlı JSON protokolü konuşan Unix socket sunucusu"""
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = socket_path
+        self.searchers = {}
+
+    def searcher(self, backend, profile, config):
+        # Farklı dizinlerden gelen istemciler farklı korpuslara bakar
+        key = (backend, profile, tuple(sorted(config.items())))
+        if key not in self.searchers:
+            self.searchers[key] = get_searcher(backend, profile, config)
+        return self.searchers[key]
+
+    def handle(self, request):
+        op = request.get("op")
+
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+
+        if op == "reload":
+            # Yeniden indexlemeden sonra önbelleğe alınmış sözlükler geçersizdir
+            self.searchers = {}
+            return {"ok": True}
+
+        if op == "search":
+            backend = request.get("backend", "sqlite")
+            config = request.get("config") or searcher_config(backend)
+            searcher = self.searcher(backend, request.get("profile", "default"), config)
+            results = search_results(searcher, backend, request["keyword"], request.get("limit", 5))
+            return {"ok": True, "results": results}
+
+        return {"ok": False, "error": f"Bilinmeyen işlem: {op}"}
+
+    def serve_connection(self, conn):
+        """Bağlantıdaki tek isteği yanıtla; stop isteğinde False döndür"""
+        with conn, conn.makefile("rwb") as stream:
+            line = stream.readline()
+            if not line:
+                return True
+
+            try:
+                request = json.loads(line)
+                if request.get("op") == "stop":
+                    stream.write(b'{"ok": true}\n')
+                    return False
+                response = self.handle(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+
+            stream.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        return True
+
+    def serve(self):
+        if os.path.dirname(os.path.abspath(self.socket_path)) == os.path.abspath(SOCKET_DIR):
+            ensure_private_dir(SOCKET_DIR)
+
+        if os.path.lexists(self.socket_path):
+            if not owned_socket(self.socket_path):
+                raise PermissionError(f"Socket yolu başka bir kullanıcıya ait: {self.socket_path}")
+            os.remove(self.socket_path)
+
+        # Socket dosyası baştan 0600 oluşsun (bind ile chmod arasında açık kalmasın)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        print(f"✓ Daemon dinliyor: {self.socket_path} (pid {os.getpid()})")
+
+        try:
+            while True:
+                conn, _ = server.accept()
+                # Yanıt vermeyen bir istemci tek thread'li daemon'u kilitlemesin
+                conn.settimeout(CONNECTION_TIMEOUT)
+                try:
+                    if not self.serve_connection(conn):
+                        break
+                except OSError as e:
+                    print(f"✗ Bağlantı hatası: {e}")
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            print("✓ Daemon durduruldu")
+
+
+def daemon_request(request, socket_path=SOCKET_PATH, timeout=30):
+    """Daemon'a istek gönder; daemon yoksa veya yanıt alınamazsa None döndür"""
+    if not os.path.lexists(socket_path):
+        return None
+
+    if not owned_socket(socket_path):
+        print(f"✗ Socket bu kullanıcıya ait değil, yok sayılıyor: {socket_path}", file=sys.stderr)
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            with client.makefile("rwb") as stream:
+                stream.write(json.dumps(request).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+        return json.loads(line) if line else None
+    except (OSError, json.JSONDecodeError):
+        # Eski socket dosyası kalmış, daemon zaman aşımına uğradı veya yanıt bozuk:
+        # çağıran arama sürecin içinde yapılır
+        return None
+
+
+def start_daemon_background(socket_path=SOCKET_PATH):
+    """Daemon'u arka planda başlat (çift fork)"""
+    if os.path.lexists(socket_path) and not owned_socket(socket_path):
+        print(f"✗ Socket yolu başka bir kullanıcıya ait: {socket_path}")
+        return
+
+    if daemon_request({"op": "ping"}, socket_path):
+        print(f"ℹ Daemon zaten çalışıyor: {socket_path}")
+        return
+
+    if os.fork():
+        # Ebeveyn: socket hazır olana kadar kısa süre bekle
+        for _ in range(50):
+            response = daemon_request({"op": "ping"}, socket_path)
+            if response:
+                print(f"✓ Daemon başlatıldı (pid {response['pid']})")
+                return
+            time.sleep(0.1)
+        print("✗ Daemon başlatılamadı")
+        return
+
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    try:
+        SearchDaemon(socket_path).serve()
+    finally:
+        os._exit(0)
+
+
+# --- Alt komutlar ---------------------------------------------------------------
+
+def cmd_scrape(args):
+    if args.stream:
+        from pipeline import ScrapePipeline
+        import wikipedia_scraper
+
+        pipeline = ScrapePipeline(make_pdf=args.pdf)
+        pipeline.run(wikipedia_scraper.search_terms[:args.limit], resume=not args.restart)
+    else:
+        import wikipedia_scraper
+        wikipedia_scraper.main()
+
+    daemon_request({"op": "reload"})
+
+
+def searcher_keywords(backend):
+    """Backend'in varsayılan anahtar kelime listesi"""
+    if backend == "sqlite":
+        from elastic_search import SEARCH_KEYWORDS
+    else:
+        from main import SEARCH_KEYWORDS
+    return SEARCH_KEYWORDS
+
+
+def cmd_index(args):
+    searcher = get_searcher(args.backend, args.profile)
+
+    if args.backend == "sqlite":
+        ready = searcher.setup_database()
+    else:
+        ready = searcher.setup_elasticsearch_index()
+    if not ready:
+        return 1
+
+    if args.percolate:
+        if args.backend == "sqlite":
+            searcher.percolator.register(searcher_keywords(args.backend))
+        elif not searcher.register_standing_queries(searcher_keywords(args.backend)):
+            return 1
+
+    if not searcher.index_pdfs():
+        return 1
+
+    daemon_request({"op": "reload"})
+    return 0
+
+
+def cmd_search(args):
+    keywords = args.keywords or searcher_keywords(args.backend)
+
+    if args.export:
+        if len(args.keywords) != 1:
+            print("✗ --export tek bir anahtar kelime ile kullanılır")
+            return 1
+        get_searcher(args.backend, args.profile).export_jsonl(args.keywords[0], args.export)
+        return 0
+
+    config = searcher_config(args.backend)
+    searcher = None
+    for keyword in keywords:
+        response = None
+        if not args.no_daemon:
+            response = daemon_request({
+                "op": "search", "backend": args.backend, "profile": args.profile,
+                "config": config, "keyword": keyword, "limit": args.limit
+            })
+
+        if response and response.get("ok"):
+            results = response["results"]
+        else:
+            if response:
+                print(f"✗ Daemon hatası: {response.get('error')}")
+            searcher = searcher or get_searcher(args.backend, args.profile, config)
+            results = search_results(searcher, args.backend, keyword, args.limit)
+
+        if args.json:
+            print(json.dumps({"keyword": keyword, "results": results}, ensure_ascii=False, default=str))
+        else:
+            searcher = searcher or get_searcher(args.backend, args.profile, config)
+            searcher.print_search_results(keyword, results)
+    return 0
+
+
+def cmd_bench(args):
+    if args.backend == "elasticsearch":
+        from main import benchmark_profiles
+        benchmark_profiles(args.profiles or None)
+        return 0
+
+    # SQLite: anahtar kelime başına sorgu gecikmesi
+    searcher = get_searcher("sqlite")
+    latencies = []
+    for _ in range(args.repeat):
+        for keyword in searcher_keywords("sqlite"):
+            start = time.perf_counter()
+            searcher.search_keyword(keyword, limit=5)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"📊 {len(latencies)} sorgu: ort. {1000 * sum(latencies) / len(latencies):.2f} ms, "
+          f"p95 {1000 * latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+    return 0
+
+
+def cmd_daemon(args):
+    if args.action == "run":
+        try:
+            SearchDaemon(args.socket).serve()
+        except PermissionError as e:
+            print(f"✗ {e}")
+            return 1
+    elif args.action == "start":
+        start_daemon_background(args.socket)
+    elif args.action == "stop":
+        if daemon_request({"op": "stop"}, args.socket):
+            print("✓ Daemon durduruldu")
+        else:
+            print("ℹ Çalışan daemon yok")
+    else:
+        response = daemon_request({"op": "ping"}, args.socket)
+        print(f"✓ Çalışıyor (pid {response['pid']})" if response else "ℹ Çalışan daemon yok")
+    return 0
+
+
+def build_parser():
+    from main import INDEX_PROFILES
+
+    parser = argparse.ArgumentParser(description="Wikipedia PDF arama sistemi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help="Wikipedia makalelerini indir")
+    scrape.add_argument("--stream", action="store_true", help="Akış pipeline'ı ile doğrudan SQLite'a indexle")
+    scrape.add_argument("--pdf", action="store_true", help="--stream ile ara adımda PDF oluştur")
+    scrape.add_argument("--limit", type=int, default=50)
+    scrape.add_argument("--restart", action="store_true", help="Checkpoint'i yok say")
+    scrape.set_defaults(func=cmd_scrape)
+
+    for name, func, help_text in (
+        ("index", cmd_index, "PDF'leri indexle"),
+        ("search", cmd_search, "Kelime ara (varsayılan: SEARCH_KEYWORDS)"),
+        ("bench", cmd_bench, "Sorgu gecikmesini / ES profillerini ölç"),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--backend", choices=BACKENDS, default="sqlite")
+        sub.add_argument("--profile", choices=list(INDEX_PROFILES), default="default",
+                         help="Elasticsearch index profili")
+        sub.set_defaults(func=func)
+
+        if name == "index":
+            sub.add_argument("--percolate", action="store_true", help="Standing query'leri kaydet ve eşleştir")
+        elif name == "search":
+            sub.add_argument("keywords", nargs="*")
+            sub.add_argument("--limit", type=int, default=5)
+            sub.add_argument("--json", action="store_true", help="Sonuçları JSON satırı olarak yaz")
+            sub.add_argument("--export", metavar="FILE", help="Tüm sonuçları JSONL olarak dışa aktar")
+            sub.add_argument("--no-daemon", action="store_true", help="Daemon'u kullanma")
+        else:
+            sub.add_argument("--repeat", type=int, default=5)
+            sub.add_argument("--profiles", nargs="*", help="Karşılaştırılacak ES profilleri")
+
+    daemon = subparsers.add_parser("daemon", help="Sıcak arama daemon'unu yönet")
+    daemon.add_argument("action", choices=["start", "stop", "status", "run"])
+    daemon.add_argument("--socket", default=SOCKET_PATH)
+    daemon.set_defaults(func=cmd_daemon)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
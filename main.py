@@ -1,9 +1,14 @@
 import os
 import json
-from elasticsearch import Elasticsearch
-from PyPDF2 import PdfReader
+import sqlite3
+import argparse
 import re
+import time
+import copy
 from datetime import datetime
+from scripts.fuzzy_index import FuzzyTermIndex, count_terms
+from scripts.dedup import MinHashDeduplicator
+from scripts.percolator import QueryPercolator
 
 # Data & Cloud Technologies ile ilgili 10 kelime
 SEARCH_KEYWORDS = [
@@ -22,14 +27,119 @@ SEARCH_KEYWORDS = [
 # Elasticsearch bağlantısı
 ES_HOST = "localhost:9200"
 INDEX_NAME = "wikipedia_pdfs"
+VOCAB_DB_PATH = "wikipedia_vocab.db"
+PERCOLATOR_INDEX_NAME = "wikipedia_pdfs_queries"
+PERCOLATOR_DB_PATH = "wikipedia_percolator.db"
+
+# Ortak alan eşlemesi; profiller bunun üzerine kendi ayarlarını ekler
+BASE_MAPPING = {
+    "properties": {
+        "title": {
+            "type": "text",
+            "analyzer": "standard"
+        },
+        "content": {
+            "type": "text",
+            "analyzer": "standard"
+        },
+        "filename": {
+            "type": "keyword"
+        },
+        "created_at": {
+            "type": "date"
+        },
+        "page_count": {
+            "type": "integer"
+        }
+    }
+}
+
+DEFAULT_HIGHLIGHT = {
+    "fragment_size": 150,
+    "number_of_fragments": 3
+}
+
+# İndex profilleri: ingest hızı, index boyutu ve highlight maliyeti arasındaki denge
+INDEX_PROFILES = {
+    # Eski davranış: her hit için content _source'tan yeniden analiz edilerek highlight edilir
+    "default": {
+        "settings": {},
+        "fields": {},
+        "source_excludes": [],
+        "highlight": DEFAULT_HIGHLIGHT
+    },
+    # Offset'ler term vector olarak saklanır, FVH yeniden analiz yapmadan highlight eder
+    "fast-highlight": {
+        "settings": {},
+        "fields": {
+            "content": {"term_vector": "with_positions_offsets"}
+        },
+        "source_excludes": [],
+        "highlight": dict(DEFAULT_HIGHLIGHT, type="fvh")
+    },
+    # Küçük index, hızlı ingest: content _source'ta tutulmaz, highlight yapılmaz
+    "lean": {
+        "settings": {
+            "index": {"codec": "best_compression"}
+        },
+        "fields": {
+            "title": {"norms": False},
+            "content": {"index_options": "freqs"}
+        },
+        "source_excludes": ["content"],
+        "highlight": None
+    }
+}
+
+def build_index_body(profile):
+    """Profil için index ayarlarını ve eşlemesini oluştur"""
+    config = INDEX_PROFILES[profile]
+    mappings = copy.deepcopy(BASE_MAPPING)
+    
+    for field, options in config["fields"].items():
+        mappings["properties"][field].update(options)
+    
+    if config["source_excludes"]:
+        mappings["_source"] = {"excludes": config["source_excludes"]}
+    
+    # Arama tarafı highlight ayarını index'in kendisinden okuyabilsin
+    mappings["_meta"] = {"profile": profile}
+    
+    body = {"mappings": mappings}
+    if config["settings"]:
+        body["settings"] = config["settings"]
+    return body
+
+def title_from_filename(pdf_file):
+    """Başlığı dosya adından çıkar"""
+    title = pdf_file.replace('.pdf', '').replace('_', ' ')
+    return re.sub(r'^\d+\s*', '', title)  # Başındaki sayıları kaldır
 
 class WikipediaPDFSearcher:
-    def __init__(self, pdf_directory="wikipedia_pdfs", es_host=ES_HOST):
+    def __init__(self, pdf_directory="wikipedia_pdfs", es_host=ES_HOST,
+                 profile="default", index_name=INDEX_NAME,
+                 vocab_db_path=VOCAB_DB_PATH, percolator_db_path=PERCOLATOR_DB_PATH):
+        if profile not in INDEX_PROFILES:
+            raise ValueError(f"Bilinmeyen index profili: {profile}")
+        
         self.pdf_directory = pdf_directory
-        self.es = Elasticsearch([es_host])
-        self.index_name = INDEX_NAME
+        self.es_host = es_host
+        self._es = None
+        self.index_name = index_name
+        self.profile = profile
+        self._index_profile = None
+        self.fuzzy_index = FuzzyTermIndex(vocab_db_path)
+        self.percolator = QueryPercolator(percolator_db_path)
         
-    def setup_elasticsearch_index(self):
+    @property
+    def es(self):
+        """Elasticsearch istemcisi ilk kullanımda oluşturulur (import maliyeti dahil)"""
+        if self._es is None:
+            from elasticsearch import Elasticsearch
+            self._es = Elasticsearch([self.es_host])
+        return self._es
+    
+    def setup_elasticsearch_index(self, reset_matches=True):
         """Elasticsearch index'ini oluştur"""
         try:
             # Index varsa sil
@@ -38,40 +148,116 @@ class WikipediaPDFSearcher:
                 print(f"✓ Eski index silindi: {self.index_name}")
             
             # Yeni index oluştur
-            index_mapping = {
-                "mappings": {
-                    "properties": {
-                        "title": {
-                            "type": "text",
-                            "analyzer": "standard"
-                        },
-                        "content": {
-                            "type": "text", 
-                            "analyzer": "standard"
-                        },
-                        "filename": {
-                            "type": "keyword"
-                        },
-                        "created_at": {
-                            "type": "date"
-                        },
-                        "page_count": {
-                            "type": "integer"
+            index_mapping = build_index_body(self.profile)
+            
+            self.es.indices.create(index=self.index_name, body=index_mapping)
+            self._index_profile = self.profile
+            print(f"✓ Yeni index oluşturuldu: {self.index_name} (profil: {self.profile})")
+            
+            # Standing query'ler korunur, eski korpusun eşleşmeleri silinir
+            if reset_matches:
+                conn = sqlite3.connect(self.percolator.db_path)
+                self.percolator.reset_matches(conn.cursor())
+                conn.commit()
+                conn.close()
+            return True
+            
+        except Exception as e:
+            print(f"✗ Index oluşturma hatası: {e}")
+            return False
+    
+    def build_query(self, keyword):
+        """Arama ve percolator için ortak sorgu"""
+        return {
+            "multi_match": {
+                "query": keyword,
+                "fields": ["title^2", "content"],  # title'a 2x ağırlık
+                "type": "best_fields"
+            }
+        }
+    
+    def register_standing_queries(self, keywords):
+        """Sorguları percolator index'ine ve yerel sonuç tablosuna kaydet"""
+        try:
+            if not self.es.indices.exists(index=PERCOLATOR_INDEX_NAME):
+                percolator_mapping = {
+                    "mappings": {
+                        "properties": {
+                            "query": {
+                                "type": "percolator"
+                            },
+                            "keyword": {
+                                "type": "keyword"
+                            },
+                            # Percolate edilen dokümanın alanları ana index ile aynı analiz edilmeli
+                            "title": {
+                                "type": "text",
+                                "analyzer": "standard"
+                            },
+                            "content": {
+                                "type": "text",
+                                "analyzer": "standard"
+                            }
                         }
                     }
                 }
-            }
+                self.es.indices.create(index=PERCOLATOR_INDEX_NAME, body=percolator_mapping)
+                print(f"✓ Percolator index oluşturuldu: {PERCOLATOR_INDEX_NAME}")
             
-            self.es.indices.create(index=self.index_name, body=index_mapping)
-            print(f"✓ Yeni index oluşturuldu: {self.index_name}")
+            for keyword in keywords:
+                self.es.index(
+                    index=PERCOLATOR_INDEX_NAME,
+                    id=keyword,
+                    body={"keyword": keyword, "query": self.build_query(keyword)}
+                )
+            self.es.indices.refresh(index=PERCOLATOR_INDEX_NAME)
+            
+            self.percolator.register(keywords, backfill=self.backfill_standing_query)
             return True
             
         except Exception as e:
-            print(f"✗ Index oluşturma hatası: {e}")
+            print(f"✗ Standing query kayıt hatası: {e}")
             return False
     
+    def backfill_standing_query(self, keyword):
+        """Yeni sorguyu canlı index'e karşı çalıştır: [(doc_id, başlık, dosya adı)]"""
+        if not self.es.indices.exists(index=self.index_name):
+            return
+        
+        self.es.indices.refresh(index=self.index_name)
+        for hit in self.iter_search(keyword, correct=False):
+            yield hit["id"], hit["title"], hit["filename"]
+    
+    def percolate_document(self, doc_id, doc):
+        """Yeni dokümanla eşleşen standing query'leri bul ve sonuç tablosuna ekle"""
+        try:
+            response = self.es.search(
+                index=PERCOLATOR_INDEX_NAME,
+                body={
+                    "query": {
+                        "percolate": {
+                            "field": "query",
+                            "document": {"title": doc["title"], "content": doc["content"]}
+                        }
+                    },
+                    "_source": ["keyword"]
+                },
+                size=1000
+            )
+            keywords = [hit['_source']['keyword'] for hit in response['hits']['hits']]
+            
+            conn = sqlite3.connect(self.percolator.db_path)
+            self.percolator.record_keywords(conn.cursor(), keywords, doc_id, doc["title"], doc["filename"])
+            conn.commit()
+            conn.close()
+            
+        except Exception as e:
+            print(f"  ✗ Percolation hatası: {e}")
+    
     def extract_text_from_pdf(self, pdf_path):
         """PDF'den metin çıkar"""
+        from PyPDF2 import PdfReader
+        
         try:
             reader = PdfReader(pdf_path)
             text = ""
@@ -95,7 +281,7 @@ class WikipediaPDFSearcher:
             print(f"✗ PDF klasörü bulunamadı: {self.pdf_directory}")
             return False
         
-        pdf_files = [f for f in os.listdir(self.pdf_directory) if f.endswith('.pdf')]
+        pdf_files = [f for f in sorted(os.listdir(self.pdf_directory)) if f.endswith('.pdf')]
         
         if not pdf_files:
             print(f"✗ PDF dosyası bulunamadı: {self.pdf_directory}")
@@ -103,7 +289,17 @@ class WikipediaPDFSearcher:
         
         print(f"📁 {len(pdf_files)} PDF dosyası bulundu")
         
+        # SQLite tarafı gibi: kayıtlı standing query varsa (önceki bir çalışmadan da olsa)
+        # her doküman percolate edilir; percolator index'i yoksa yeniden oluşturulur
+        standing_keywords = self.percolator.keywords()
+        percolate = bool(standing_keywords)
+        if percolate and not self.es.indices.exists(index=PERCOLATOR_INDEX_NAME):
+            percolate = self.register_standing_queries(standing_keywords)
+        
         success_count = 0
+        duplicate_count = 0
+        term_frequencies = {}
+        deduplicator = MinHashDeduplicator()
         
         for pdf_file in pdf_files:
             pdf_path = os.path.join(self.pdf_directory, pdf_file)
@@ -113,9 +309,15 @@ class WikipediaPDFSearcher:
             content, page_count = self.extract_text_from_pdf(pdf_path)
             
             if content:
+                # Aynı/neredeyse aynı makale daha önce indexlendiyse atla
+                duplicate = deduplicator.add(pdf_file, content)
+                if duplicate:
+                    print(f"  ⧉ Yineleniyor, atlandı: {duplicate}")
+                    duplicate_count += 1
+                    continue
+                
                 # Başlığı dosya adından çıkar
-                title = pdf_file.replace('.pdf', '').replace('_', ' ')
-                title = re.sub(r'^\d+\s*', '', title)  # Başındaki sayıları kaldır
+                title = title_from_filename(pdf_file)
                 
                 # Elasticsearch'e kaydet
                 doc = {
@@ -133,39 +335,75 @@ class WikipediaPDFSearcher:
                     )
                     print(f"  ✓ İndexlendi: {response['_id']}")
                     success_count += 1
+                    count_terms(f"{title} {content}", term_frequencies)
+                    
+                    if percolate:
+                        self.percolate_document(response['_id'], doc)
                     
                 except Exception as e:
                     print(f"  ✗ İndexleme hatası: {e}")
+        
+        # Sorgu anında fuzziness yerine önceden hesaplanmış sözlükle düzeltme yapılır
+        self.fuzzy_index.build(term_frequencies.items())
             
         print(f"\n📊 İndexleme tamamlandı: {success_count}/{len(pdf_files)} başarılı")
+        if duplicate_count:
+            print(f"⧉ {duplicate_count} yinelenen doküman atlandı")
         return success_count > 0
     
+    def correct_keyword(self, keyword):
+        """Yazım hatalarını önceden hesaplanmış sözlükle düzelt"""
+        corrected = self.fuzzy_index.correct(keyword)
+        if corrected and corrected != keyword:
+            print(f"  ✎ Düzeltildi: '{keyword}' → '{corrected}' (orijinal de aranır)")
+            return corrected
+        return keyword
+    
+    def build_search_query(self, keyword, correct=True):
+        """Arama sorgusu; düzeltilmiş hali orijinal sorgunun yanına eklenir, yerine geçmez"""
+        query = self.build_query(keyword)
+        if correct:
+            corrected = self.correct_keyword(keyword)
+            if corrected != keyword:
+                # fuzziness AUTO gibi: tam eşleşmeler sözlük eski olsa bile kaybolmaz
+                query = {"bool": {"should": [query, self.build_query(corrected)]}}
+        return query
+    
+    def index_profile(self):
+        """Index'in oluşturulduğu profil (mapping _meta'dan okunur, bir kez)"""
+        if self._index_profile is None:
+            try:
+                mapping = self.es.indices.get_mapping(index=self.index_name)
+            except Exception:
+                # Index henüz yok: searcher'ın kendi profili kullanılır
+                return self.profile
+            
+            # _meta'sız index'ler profillerden önce oluşturulmuştur (default)
+            mappings = next(iter(mapping.values()))["mappings"]
+            profile = mappings.get("_meta", {}).get("profile", "default")
+            self._index_profile = profile if profile in INDEX_PROFILES else "default"
+        
+        return self._index_profile
+    
+    def build_search_body(self, keyword):
+        """Arama gövdesi; highlight ayarı index'in gerçek profiline göre seçilir"""
+        query = {
+            "query": self.build_search_query(keyword),
+            "_source": ["title", "filename", "page_count"]
+        }
+        
+        highlight = INDEX_PROFILES[self.index_profile()]["highlight"]
+        if highlight:
+            query["highlight"] = {"fields": {"content": highlight}}
+        
+        return query
+    
     def search_keyword(self, keyword, size=10):
         """Belirli bir kelimeyi ara"""
         try:
-            query = {
-                "query": {
-                    "multi_match": {
-                        "query": keyword,
-                        "fields": ["title^2", "content"],  # title'a 2x ağırlık
-                        "type": "best_fields",
-                        "fuzziness": "AUTO"  # Yazım hatalarına tolerans
-                    }
-                },
-                "highlight": {
-                    "fields": {
-                        "content": {
-                            "fragment_size": 150,
-                            "number_of_fragments": 3
-                        }
-                    }
-                },
-                "_source": ["title", "filename", "page_count"]
-            }
-            
             response = self.es.search(
                 index=self.index_name,
-                body=query,
+                body=self.build_search_body(keyword),
                 size=size
             )
             
@@ -175,6 +413,57 @@ class WikipediaPDFSearcher:
             print(f"✗ Arama hatası ({keyword}): {e}")
             return None
     
+    def iter_search(self, keyword, page_size=100, keep_alive="1m", correct=True):
+        """Tüm eşleşmeleri point-in-time + search_after ile sabit bellekte üret"""
+        search_query = self.build_search_query(keyword, correct)
+        
+        # PIT, sayfalar arasında tutarlı bir görüntü sağlar; from/size yerine
+        # son hit'in sort değerinden devam edilir
+        pit_id = self.es.open_point_in_time(index=self.index_name, keep_alive=keep_alive)['id']
+        search_after = None
+        
+        try:
+            while True:
+                query = {
+                    "query": search_query,
+                    "pit": {"id": pit_id, "keep_alive": keep_alive},
+                    "sort": [{"_score": "desc"}, {"_shard_doc": "asc"}],
+                    "track_total_hits": False,
+                    "_source": ["title", "filename", "page_count"]
+                }
+                if search_after:
+                    query["search_after"] = search_after
+                
+                response = self.es.search(body=query, size=page_size)
+                hits = response['hits']['hits']
+                if not hits:
+                    break
+                
+                for hit in hits:
+                    yield {
+                        "id": hit['_id'],
+                        "title": hit['_source']['title'],
+                        "filename": hit['_source']['filename'],
+                        "page_count": hit['_source']['page_count'],
+                        "score": hit['_score']
+                    }
+                
+                pit_id = response.get('pit_id', pit_id)
+                search_after = hits[-1]['sort']
+        finally:
+            self.es.close_point_in_time(id=pit_id)
+    
+    def export_jsonl(self, keyword, output_path, page_size=100):
+        """Kelimenin tüm eşleşmelerini JSONL dosyasına akış halinde yaz"""
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for hit in self.iter_search(keyword, page_size=page_size):
+                f.write(json.dumps(hit, ensure_ascii=False) + "\n")
+                count += 1
+        
+        print(f"✓ '{keyword}' için {count} sonuç yazıldı: {output_path}")
+        return count
+    
     def print_search_results(self, keyword, results):
         """Arama sonuçlarını yazdır"""
         if not results or results['hits']['total']['value'] == 0:
@@ -222,6 +511,24 @@ class WikipediaPDFSearcher:
                 results_summary[keyword] = 0
                 print(f"❌ '{keyword}' için arama yapılamadı\n")
         
+        self.print_summary(results_summary)
+    
+    def print_percolation_summary(self):
+        """Standing query eşleşmelerini materyalize tablodan oku (arama yapılmaz)"""
+        print("🚀 Standing query sonuçları (percolation)")
+        print("=" * 60)
+        
+        results_summary = self.percolator.summary()
+        for keyword in results_summary:
+            matches = self.percolator.matches(keyword)
+            print(f"\n🔍 '{keyword}': {len(matches)} doküman")
+            for title, filename in matches[:5]:
+                print(f"   • {title} ({filename})")
+        
+        self.print_summary(results_summary)
+    
+    def print_summary(self, results_summary):
+        """Kelime başına sonuç sayılarını yazdır"""
         # Özet rapor
         print("\n" + "="*60)
         print("📊 ARAMA ÖZETİ")
@@ -233,7 +540,7 @@ class WikipediaPDFSearcher:
         total_found = sum(results_summary.values())
         print(f"\n📈 Toplam sonuç: {total_found}")
     
-    def run(self):
+    def run(self, percolate=False):
         """Ana çalıştırma fonksiyonu"""
         print("🔧 Elasticsearch Wikipedia PDF Arama Sistemi")
         print("=" * 50)
@@ -242,12 +549,19 @@ class WikipediaPDFSearcher:
         if not self.setup_elasticsearch_index():
             return False
         
+        # Percolator modunda sorgular indexlemeden önce kaydedilir
+        if percolate and not self.register_standing_queries(SEARCH_KEYWORDS):
+            return False
+        
         # 2. PDF'leri indexle
         if not self.index_pdfs():
             return False
         
+        if percolate:
+            self.print_percolation_summary()
+            return True
+        
         # Biraz bekle (indexleme tamamlansın)
-        import time
         print("⏳ İndexleme tamamlanması bekleniyor...")
         time.sleep(2)
         
@@ -256,9 +570,97 @@ class WikipediaPDFSearcher:
         
         return True
 
+def benchmark_profiles(profiles=None, pdf_directory="wikipedia_pdfs", repeat=5):
+    """Her profil için index boyutu, ingest hızı ve sorgu gecikmesini ölç"""
+    profiles = profiles or list(INDEX_PROFILES)
+    
+    # PDF'ler bir kez okunur; ölçüm sadece Elasticsearch tarafını kapsar
+    reader = WikipediaPDFSearcher(pdf_directory)
+    documents = []
+    for pdf_file in sorted(os.listdir(pdf_directory)):
+        if not pdf_file.endswith('.pdf'):
+            continue
+        content, page_count = reader.extract_text_from_pdf(os.path.join(pdf_directory, pdf_file))
+        if content:
+            documents.append({
+                "title": title_from_filename(pdf_file),
+                "content": content,
+                "filename": pdf_file,
+                "created_at": datetime.now(),
+                "page_count": page_count
+            })
+    
+    if not documents:
+        print(f"✗ PDF dosyası bulunamadı: {pdf_directory}")
+        return {}
+    
+    report = {}
+    for profile in profiles:
+        print(f"\n⏱  Profil ölçülüyor: {profile}")
+        searcher = WikipediaPDFSearcher(pdf_directory, profile=profile,
+                                        index_name=f"{INDEX_NAME}_bench_{profile}")
+        if not searcher.setup_elasticsearch_index(reset_matches=False):
+            continue
+        
+        try:
+            # Ingest
+            start = time.perf_counter()
+            for doc in documents:
+                searcher.es.index(index=searcher.index_name, body=doc)
+            searcher.es.indices.refresh(index=searcher.index_name)
+            ingest_seconds = time.perf_counter() - start
+            
+            # Boyut (segmentler birleştirildikten sonra)
+            searcher.es.indices.forcemerge(index=searcher.index_name, max_num_segments=1)
+            stats = searcher.es.indices.stats(index=searcher.index_name)
+            size_bytes = stats['_all']['primaries']['store']['size_in_bytes']
+            
+            # Sorgu gecikmesi (highlight dahil, top 5)
+            latencies = []
+            for _ in range(repeat):
+                for keyword in SEARCH_KEYWORDS:
+                    start = time.perf_counter()
+                    searcher.es.search(index=searcher.index_name,
+                                       body=searcher.build_search_body(keyword), size=5)
+                    latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            
+            report[profile] = {
+                "size_kb": size_bytes / 1024,
+                "docs_per_second": len(documents) / ingest_seconds,
+                "latency_ms_avg": 1000 * sum(latencies) / len(latencies),
+                "latency_ms_p95": 1000 * latencies[int(len(latencies) * 0.95) - 1]
+            }
+        finally:
+            searcher.es.indices.delete(index=searcher.index_name)
+    
+    print("\n" + "="*72)
+    print("📊 PROFİL KARŞILAŞTIRMASI")
+    print("="*72)
+    print(f"{'profil':16} {'boyut (KB)':>12} {'ingest (dok/s)':>16} {'ort. (ms)':>12} {'p95 (ms)':>10}")
+    for profile, row in report.items():
+        print(f"{profile:16} {row['size_kb']:12.1f} {row['docs_per_second']:16.1f} "
+              f"{row['latency_ms_avg']:12.2f} {row['latency_ms_p95']:10.2f}")
+    
+    return report
+
 def main():
     """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="Elasticsearch Wikipedia PDF Arama Sistemi")
+    parser.add_argument("--percolate", action="store_true",
+                        help="Sorguları ingest sırasında eşleştir, özeti materyalize tablodan oku")
+    parser.add_argument("--export", metavar="KEYWORD",
+                        help="Mevcut index'ten kelimenin tüm sonuçlarını JSONL olarak dışa aktar")
+    parser.add_argument("--output", default="results.jsonl", help="--export için çıktı dosyası")
+    parser.add_argument("--profile", choices=list(INDEX_PROFILES), default="default",
+                        help="Elasticsearch index profili")
+    parser.add_argument("--bench-profiles", action="store_true",
+                        help="Tüm profillerin boyut, ingest ve sorgu gecikmesini karşılaştır")
+    args = parser.parse_args()
+    
     # Elasticsearch bağlantısını kontrol et
+    from elasticsearch import Elasticsearch
+    
     try:
         es_test = Elasticsearch([ES_HOST])
         if not es_test.ping():
@@ -272,9 +674,18 @@ def main():
         print(f"❌ Elasticsearch bağlantı hatası: {e}")
         return
     
+    if args.bench_profiles:
+        benchmark_profiles()
+        return
+    
     # Arama sistemini başlat
-    searcher = WikipediaPDFSearcher()
-    searcher.run()
+    searcher = WikipediaPDFSearcher(profile=args.profile)
+    
+    if args.export:
+        searcher.export_jsonl(args.export, args.output)
+        return
+    
+    searcher.run(percolate=args.percolate)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
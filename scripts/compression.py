@@ -0,0 +1,66 @@
+import re
+import zlib
+import hashlib
+
+# Doküman gövdeleri zlib ile sıkıştırılır. Kısa dokümanlarda bile iyi oran
+# almak için korpustan eğitilen ortak bir ön-sözlük (zdict) kullanılır.
+DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def train_dictionary(texts, size=DICTIONARY_SIZE):
+    """Örnek metinlerde sık geçen kelime ve kelime ikililerinden zlib sözlüğü oluştur"""
+    counts = {}
+    for text in texts:
+        words = WORD_PATTERN.findall(text)
+        seen = set(words)
+        seen.update(' '.join(words[i:i + 2]) for i in range(len(words) - 1))
+        for item in seen:
+            counts[item] = counts.get(item, 0) + 1
+
+    # Sadece birden çok dokümanda geçen parçalar işe yarar; kazanç ≈ frekans * uzunluk
+    candidates = [(count * len(item), item) for item, count in counts.items() if count > 1]
+    candidates.sort(reverse=True)
+
+    chosen = []
+    total = 0
+    for _, item in candidates:
+        piece = item + ' '
+        if total + len(piece.encode('utf-8')) > size:
+            continue
+        chosen.append(piece)
+        total += len(piece.encode('utf-8'))
+
+    # zlib sözlüğün sonundaki baytlara en kısa mesafeyle referans verir,
+    # bu yüzden en değerli parçalar sona yazılır
+    chosen.reverse()
+    return ''.join(chosen).encode('utf-8')
+
+
+def dictionary_checksum(dictionary):
+    """Sözlüğün içeriğine bağlı kimlik (id'ler yeniden kullanılsa bile ayırt eder)"""
+    return hashlib.sha1(dictionary).hexdigest()
+
+
+class ContentCompressor:
+    """Tek bir sözlükle (veya sözlüksüz) metin sıkıştırır/açar"""
+
+    def __init__(self, dictionary=None, level=COMPRESSION_LEVEL):
+        self.dictionary = dictionary
+        self.level = level
+
+    def compress(self, text):
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+    def decompress(self, blob):
+        if self.dictionary:
+            decompressor = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
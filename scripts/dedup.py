@@ -0,0 +1,88 @@
+import re
+import array
+import hashlib
+
+# MinHash imzaları + LSH bantlama ile neredeyse aynı dokümanları bulur.
+# bands * rows = NUM_PERM; LSH aday eşiği ≈ (1/bands)^(1/rows) ≈ 0.7,
+# adaylar daha sonra imza benzerliği THRESHOLD ile doğrulanır.
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Metni kelime n-gram'larına (shingle) böl"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hashes(shingle, count, salt):
+    """Tek bir shake_128 çağrısıyla shingle için count adet bağımsız 32-bit hash üret"""
+    digest = hashlib.shake_128(salt + shingle.encode('utf-8')).digest(4 * count)
+    return array.array('I', digest)
+
+
+class MinHashDeduplicator:
+    """Eklenen dokümanlar arasında yineleneni tespit eder"""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=b""):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm, bands'e tam bölünmeli")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.seed = seed
+
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def signature(self, text):
+        """Metnin MinHash imzasını hesapla"""
+        rows = [_hashes(s, self.num_perm, self.seed) for s in shingles(text)]
+        if not rows:
+            return None
+
+        # Her hash fonksiyonu için tüm shingle'lar üzerindeki minimum
+        return tuple(map(min, zip(*rows)))
+
+    def similarity(self, sig_a, sig_b):
+        """İki imza arasındaki tahmini Jaccard benzerliği"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    def find_duplicate(self, signature):
+        """LSH bantlarında aynı kovaya düşen adaylar arasından yineleneni bul"""
+        candidates = set()
+        for band, bucket in enumerate(self.buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows]
+            candidates.update(bucket.get(key, ()))
+
+        best_key, best_score = None, 0.0
+        for candidate in candidates:
+            score = self.similarity(signature, self.signatures[candidate])
+            if score >= self.threshold and score > best_score:
+                best_key, best_score = candidate, score
+
+        return best_key
+
+    def add(self, key, text):
+        """Dokümanı ekle; yineleniyorsa eklemeden önceki dokümanın anahtarını döndür"""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        duplicate = self.find_duplicate(signature)
+        if duplicate is not None:
+            return duplicate
+
+        self.signatures[key] = signature
+        for band, bucket in enumerate(self.buckets):
+            bucket.setdefault(signature[band * self.rows:(band + 1) * self.rows], []).append(key)
+
+        return None
@@ -1,7 +1,18 @@
 import os
 import sqlite3
-from PyPDF2 import PdfReader
+import argparse
+import json
 import re
+from fuzzy_index import FuzzyTermIndex
+from dedup import MinHashDeduplicator
+from compression import ContentCompressor, train_dictionary, dictionary_checksum
+from percolator import QueryPercolator
+
+DB_PATH = "wikipedia_search.db"
+
+def vocab_db_path(db_path):
+    """Fuzzy sözlük ana veritabanını büyütmemesi için yanında ayrı dosyada tutulur"""
+    return os.path.splitext(db_path)[0] + "_vocab.db"
 
 # Data & Cloud Technologies ile ilgili 10 kelime
 SEARCH_KEYWORDS = [
@@ -18,9 +29,13 @@ SEARCH_KEYWORDS = [
 ]
 
 class WikipediaPDFSearcher:
-    def __init__(self, pdf_directory="wikipedia_pdfs"):
+    def __init__(self, pdf_directory="wikipedia_pdfs", compress=True, db_path=DB_PATH):
         self.pdf_directory = pdf_directory
-        self.db_path = "wikipedia_search.db"
+        self.db_path = db_path
+        self.fuzzy_index = FuzzyTermIndex(vocab_db_path(db_path))
+        self.percolator = QueryPercolator(self.db_path)
+        self.compress = compress
+        self._compressors = {}
         
     def setup_database(self):
         """SQLite veritabanını oluştur"""
@@ -30,29 +45,50 @@ class WikipediaPDFSearcher:
             
             # Eski tabloları sil
             cursor.execute('DROP TABLE IF EXISTS documents')
+            cursor.execute('DROP TABLE IF EXISTS documents_fts_vocab')
+            cursor.execute('DROP TABLE IF EXISTS vocab_terms')
+            cursor.execute('DROP TABLE IF EXISTS vocab_deletes')
             cursor.execute('DROP TABLE IF EXISTS documents_fts')
+            cursor.execute('DROP TABLE IF EXISTS compression_dicts')
             
-            # Ana tablo
+            # Ana tablo: content sıkıştırılmışsa BLOB, dict_id kullanılan sözlük
+            # (NULL = düz metin, 0 = sözlüksüz zlib)
             cursor.execute('''
                 CREATE TABLE documents (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     title TEXT,
-                    content TEXT,
+                    content BLOB,
+                    dict_id INTEGER,
                     filename TEXT,
                     page_count INTEGER
                 )
             ''')
             
-            # Full-text search tablosu
+            # Eğitilmiş zlib sözlükleri
+            cursor.execute('''
+                CREATE TABLE compression_dicts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dictionary BLOB,
+                    checksum TEXT
+                )
+            ''')
+            
+            # Full-text search tablosu (contentless: metin sadece documents'ta tutulur)
             cursor.execute('''
                 CREATE VIRTUAL TABLE documents_fts USING fts5(
-                    title, content, filename
+                    title, content, filename, content=''
                 )
             ''')
             
+            # Standing query'ler korunur, eski korpusun eşleşmeleri silinir
+            self.percolator.reset_matches(cursor)
+            
             conn.commit()
             conn.close()
             
+            # Eski korpusun sözlüğüyle yeni terimler "düzeltilmesin"
+            self.fuzzy_index.clear()
+            
             print(f"✓ Veritabanı hazırlandı: {self.db_path}")
             return True
             
@@ -62,6 +98,8 @@ class WikipediaPDFSearcher:
     
     def extract_text_from_pdf(self, pdf_path):
         """PDF'den metin çıkar"""
+        from PyPDF2 import PdfReader
+        
         try:
             reader = PdfReader(pdf_path)
             text = ""
@@ -79,13 +117,118 @@ class WikipediaPDFSearcher:
             print(f"✗ PDF okuma hatası ({pdf_path}): {e}")
             return None, 0
     
+    def get_compressor(self, cursor, dict_id):
+        """dict_id için sıkıştırıcıyı döndür
+        
+        Önbellek sözlüğün checksum'ına göre tutulur: veritabanı başka bir süreçte
+        yeniden oluşturulup id'ler tekrar kullanılsa bile eski sözlük kullanılmaz.
+        """
+        if not dict_id:
+            return self._compressors.setdefault(None, ContentCompressor())
+        
+        row = cursor.execute(
+            'SELECT checksum FROM compression_dicts WHERE id = ?', (dict_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Sıkıştırma sözlüğü bulunamadı: {dict_id}")
+        
+        checksum = row[0]
+        if checksum not in self._compressors:
+            dictionary = cursor.execute(
+                'SELECT dictionary FROM compression_dicts WHERE id = ?', (dict_id,)
+            ).fetchone()[0]
+            self._compressors[checksum] = ContentCompressor(dictionary)
+        
+        return self._compressors[checksum]
+    
+    def dict_id_column(self, cursor, prefix=''):
+        """documents.dict_id ifadesi; eski şemalı veritabanında içerik düz metindir (NULL)"""
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(documents)')]
+        return f'{prefix}dict_id' if 'dict_id' in columns else 'NULL'
+    
+    def encode_content(self, cursor, content):
+        """İçeriği en güncel sözlükle sıkıştır: (değer, dict_id)"""
+        if not self.compress:
+            return content, None
+        
+        row = cursor.execute('SELECT MAX(id) FROM compression_dicts').fetchone()
+        dict_id = row[0] or 0
+        return self.get_compressor(cursor, dict_id).compress(content), dict_id
+    
+    def decode_content(self, cursor, content, dict_id):
+        """Saklanan içeriği düz metne çevir"""
+        if dict_id is None:
+            return content
+        return self.get_compressor(cursor, dict_id).decompress(content)
+    
+    def index_document(self, cursor, title, content, filename, page_count):
+        """Tek bir dokümanı ana tabloya ve FTS tablosuna kaydet"""
+        stored_content, dict_id = self.encode_content(cursor, content)
+        
+        # Ana tabloya kaydet
+        cursor.execute('''
+            INSERT INTO documents (title, content, dict_id, filename, page_count)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (title, stored_content, dict_id, filename, page_count))
+        
+        doc_id = cursor.lastrowid
+        
+        # FTS tablosuna aynı rowid ile kaydet
+        cursor.execute('''
+            INSERT INTO documents_fts (rowid, title, content, filename)
+            VALUES (?, ?, ?, ?)
+        ''', (doc_id, title, content, filename))
+        
+        # Kayıtlı standing query'lerle eşleştir
+        self.percolator.percolate(cursor, doc_id, title, content, filename)
+    
+    def train_compression(self):
+        """Kayıtlı dokümanlardan sözlük eğit ve tüm gövdeleri yeni sözlükle yeniden sıkıştır"""
+        if not self.compress:
+            return False
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        dict_id_column = self.dict_id_column(cursor)
+        rows = cursor.execute(f'SELECT id, content, {dict_id_column} FROM documents').fetchall()
+        if not rows:
+            conn.close()
+            return False
+        
+        texts = {doc_id: self.decode_content(cursor, content, dict_id)
+                 for doc_id, content, dict_id in rows}
+        
+        dictionary = train_dictionary(texts.values())
+        checksum = dictionary_checksum(dictionary)
+        cursor.execute(
+            'INSERT INTO compression_dicts (dictionary, checksum) VALUES (?, ?)',
+            (dictionary, checksum)
+        )
+        dict_id = cursor.lastrowid
+        compressor = self.get_compressor(cursor, dict_id)
+        
+        updates = [(compressor.compress(text), dict_id, doc_id) for doc_id, text in texts.items()]
+        cursor.executemany('UPDATE documents SET content = ?, dict_id = ? WHERE id = ?', updates)
+        cursor.execute('DELETE FROM compression_dicts WHERE id != ?', (dict_id,))
+        self._compressors = {checksum: compressor}
+        
+        conn.commit()
+        conn.execute('VACUUM')
+        conn.close()
+        
+        raw_size = sum(len(text.encode('utf-8')) for text in texts.values())
+        stored_size = sum(len(blob) for blob, _, _ in updates)
+        print(f"✓ İçerik sıkıştırıldı: {raw_size // 1024} KB → {stored_size // 1024} KB")
+        return True
+    
     def index_pdfs(self):
         """PDF'leri veritabanına kaydet"""
         if not os.path.exists(self.pdf_directory):
             print(f"✗ PDF klasörü bulunamadı: {self.pdf_directory}")
             return False
         
-        pdf_files = [f for f in os.listdir(self.pdf_directory) if f.endswith('.pdf')]
+        pdf_files = [f for f in sorted(os.listdir(self.pdf_directory)) if f.endswith('.pdf')]
         
         if not pdf_files:
             print(f"✗ PDF dosyası bulunamadı: {self.pdf_directory}")
@@ -96,6 +239,8 @@ class WikipediaPDFSearcher:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         success_count = 0
+        duplicate_count = 0
+        deduplicator = MinHashDeduplicator()
         
         for pdf_file in pdf_files:
             pdf_path = os.path.join(self.pdf_directory, pdf_file)
@@ -105,21 +250,18 @@ class WikipediaPDFSearcher:
             content, page_count = self.extract_text_from_pdf(pdf_path)
             
             if content:
+                # Aynı/neredeyse aynı makale daha önce kaydedildiyse atla
+                duplicate = deduplicator.add(pdf_file, content)
+                if duplicate:
+                    print(f"  ⧉ Yineleniyor, atlandı: {duplicate}")
+                    duplicate_count += 1
+                    continue
+                
                 # Başlığı dosya adından çıkar
                 title = pdf_file.replace('.pdf', '').replace('_', ' ')
                 title = re.sub(r'^\d+\s*', '', title)
                 
-                # Ana tabloya kaydet
-                cursor.execute('''
-                    INSERT INTO documents (title, content, filename, page_count)
-                    VALUES (?, ?, ?, ?)
-                ''', (title, content, pdf_file, page_count))
-                
-                # FTS tablosuna kaydet
-                cursor.execute('''
-                    INSERT INTO documents_fts (title, content, filename)
-                    VALUES (?, ?, ?)
-                ''', (title, content, pdf_file))
+                self.index_document(cursor, title, content, pdf_file, page_count)
                 
                 print(f"  ✓ Kaydedildi")
                 success_count += 1
@@ -127,39 +269,135 @@ class WikipediaPDFSearcher:
         conn.commit()
         conn.close()
         
+        # Yazım hatası toleransı için kelime hazinesinden fuzzy sözlük oluştur
+        self.fuzzy_index.build_from_fts(self.db_path, 'documents_fts')
+        
+        # Gövdeleri korpustan eğitilmiş ortak sözlükle yeniden sıkıştır
+        self.train_compression()
+        
         print(f"\n📊 İndexleme tamamlandı: {success_count}/{len(pdf_files)} başarılı")
+        if duplicate_count:
+            print(f"⧉ {duplicate_count} yinelenen doküman atlandı")
         return success_count > 0
     
+    def correct_keyword(self, keyword):
+        """Yazım hatası olabilecek kelimeleri sözlükteki yakın terimlerle genişlet (orijinal korunur)"""
+        corrected = self.fuzzy_index.correct(keyword, widen=True)
+        if corrected and corrected != keyword:
+            print(f"  ✎ Genişletildi: '{keyword}' → '{corrected}'")
+            return corrected
+        return keyword
+    
     def search_keyword(self, keyword, limit=5):
         """Belirli bir kelimeyi ara"""
         try:
+            keyword = self.correct_keyword(keyword)
+            
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # FTS5 ile arama
-            cursor.execute('''
-                SELECT d.title, d.filename, d.page_count, d.content
+            # FTS5 ile arama (contentless FTS, documents ile rowid üzerinden birleşir)
+            cursor.execute(f'''
+                SELECT d.title, d.filename, d.page_count, d.content, {self.dict_id_column(cursor, 'd.')}
                 FROM documents_fts fts
-                JOIN documents d ON d.title = fts.title
-                WHERE fts MATCH ?
+                JOIN documents d ON d.id = fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY fts.rank, fts.rowid
                 LIMIT ?
             ''', (keyword, limit))
             
             results = cursor.fetchall()
-            conn.close()
             
-            # Snippet oluştur
+            # Snippet oluştur (sadece dönen satırlar açılır)
             processed_results = []
-            for title, filename, page_count, content in results:
+            for title, filename, page_count, content, dict_id in results:
+                content = self.decode_content(cursor, content, dict_id)
                 snippet = self.create_snippet(content, keyword)
                 processed_results.append((title, filename, page_count, snippet))
             
+            conn.close()
+            
             return processed_results
             
         except Exception as e:
             print(f"✗ Arama hatası ({keyword}): {e}")
             return []
     
+    def iter_search(self, keyword, page_size=100, with_snippet=True):
+        """Tüm eşleşmeleri (bm25 rank, rowid) keyset sayfalamasıyla sabit bellekte üret"""
+        keyword = self.correct_keyword(keyword)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # OFFSET yerine son görülen (rank, rowid) çiftinden devam edilir. Sıralama
+        # sadece FTS tablosunun (rowid, rank) çiftleri üzerinde yapılır; doküman
+        # satırları (sıkıştırılmış içerik dahil) sayfa başına id ile okunur.
+        last_rank, last_id = float('-inf'), 0
+        
+        try:
+            columns = 'id, title, filename, page_count'
+            if with_snippet:
+                columns += f", content, {self.dict_id_column(cursor)}"
+            
+            while True:
+                cursor.execute('''
+                    SELECT rowid, rank
+                    FROM documents_fts
+                    WHERE documents_fts MATCH ?
+                      AND (rank, rowid) > (?, ?)
+                    ORDER BY rank, rowid
+                    LIMIT ?
+                ''', (keyword, last_rank, last_id, page_size))
+                
+                page = cursor.fetchall()
+                if not page:
+                    break
+                
+                placeholders = ','.join('?' * len(page))
+                cursor.execute(
+                    f'SELECT {columns} FROM documents WHERE id IN ({placeholders})',
+                    [doc_id for doc_id, _ in page]
+                )
+                documents = {row[0]: row for row in cursor.fetchall()}
+                
+                for doc_id, rank in page:
+                    row = documents.get(doc_id)
+                    if row is None:
+                        continue
+                    
+                    hit = {
+                        "id": doc_id,
+                        "title": row[1],
+                        "filename": row[2],
+                        "page_count": row[3],
+                        "score": -rank  # bm25 rank'i negatiftir, küçük olan daha iyi
+                    }
+                    if with_snippet:
+                        hit["snippet"] = self.create_snippet(
+                            self.decode_content(cursor, row[4], row[5]), keyword
+                        )
+                    yield hit
+                
+                last_id, last_rank = page[-1]
+        
+        except sqlite3.OperationalError as e:
+            print(f"✗ Arama hatası ({keyword}): {e}")
+        
+        finally:
+            conn.close()
+    
+    def export_jsonl(self, keyword, output_path, page_size=100):
+        """Kelimenin tüm eşleşmelerini JSONL dosyasına akış halinde yaz"""
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for hit in self.iter_search(keyword, page_size=page_size):
+                f.write(json.dumps(hit, ensure_ascii=False) + "\n")
+                count += 1
+        
+        print(f"✓ '{keyword}' için {count} sonuç yazıldı: {output_path}")
+        return count
+    
     def create_snippet(self, content, keyword, max_length=200):
         """İçerikten alakalı snippet oluştur"""
         if not content:
@@ -169,6 +407,12 @@ class WikipediaPDFSearcher:
         keyword_lower = keyword.lower()
         
         pos = content_lower.find(keyword_lower)
+        if pos == -1:
+            # Genişletilmiş sorgularda ifade geçmez; ilk geçen terim esas alınır
+            positions = [content_lower.find(term) for term in re.findall(r'\w+', keyword_lower)
+                         if term not in ('and', 'or', 'not', 'near')]
+            positions = [p for p in positions if p != -1]
+            pos = min(positions) if positions else -1
         if pos == -1:
             return content[:max_length] + "..." if len(content) > max_length else content
         
@@ -222,6 +466,24 @@ class WikipediaPDFSearcher:
                 results_summary[keyword] = 0
                 print(f"❌ '{keyword}' için sonuç bulunamadı\n")
         
+        self.print_summary(results_summary)
+    
+    def print_percolation_summary(self):
+        """Standing query eşleşmelerini materyalize tablodan oku (arama yapılmaz)"""
+        print("🚀 Standing query sonuçları (percolation)")
+        print("=" * 60)
+        
+        results_summary = self.percolator.summary()
+        for keyword in results_summary:
+            matches = self.percolator.matches(keyword)
+            print(f"\n🔍 '{keyword}': {len(matches)} doküman")
+            for title, filename in matches[:5]:
+                print(f"   • {title} ({filename})")
+        
+        self.print_summary(results_summary)
+    
+    def print_summary(self, results_summary):
+        """Kelime başına sonuç sayılarını yazdır"""
         # Özet rapor
         print("\n" + "="*60)
         print("📊 ARAMA ÖZETİ")
@@ -233,7 +495,7 @@ class WikipediaPDFSearcher:
         total_found = sum(results_summary.values())
         print(f"\n📈 Toplam sonuç: {total_found}")
     
-    def run(self):
+    def run(self, percolate=False):
         """Ana çalıştırma fonksiyonu"""
         print("🔧 SQLite Wikipedia PDF Arama Sistemi")
         print("=" * 50)
@@ -241,23 +503,43 @@ class WikipediaPDFSearcher:
         if not self.setup_database():
             return False
         
+        # Percolator modunda sorgular indexlemeden önce kaydedilir
+        if percolate:
+            self.percolator.register(SEARCH_KEYWORDS)
+        
         if not self.index_pdfs():
             return False
         
+        if percolate:
+            self.print_percolation_summary()
+            return True
+        
         print("⏳ İndexleme tamamlandı, arama başlıyor...")
         
         self.search_all_keywords()
         return True
 
 def main():
+    parser = argparse.ArgumentParser(description="Wikipedia PDF Arama Sistemi (SQLite FTS5)")
+    parser.add_argument("--percolate", action="store_true",
+                        help="Sorguları ingest sırasında eşleştir, özeti materyalize tablodan oku")
+    parser.add_argument("--export", metavar="KEYWORD",
+                        help="Mevcut veritabanından kelimenin tüm sonuçlarını JSONL olarak dışa aktar")
+    parser.add_argument("--output", default="results.jsonl", help="--export için çıktı dosyası")
+    args = parser.parse_args()
+    
+    if args.export:
+        WikipediaPDFSearcher().export_jsonl(args.export, args.output)
+        return
+    
     print("📚 Wikipedia PDF Arama Sistemi (SQLite FTS5)")
     print("🔧 Elasticsearch gerekmez - Yerel SQLite ile çalışır")
     print("=" * 50)
     
     searcher = WikipediaPDFSearcher()
     
-    if searcher.run():
-        print(f"\n✅ Arama tamamlandı! Veritabanı: wikipedia_search.db")
+    if searcher.run(percolate=args.percolate):
+        print(f"\n✅ Arama tamamlandı! Veritabanı: {searcher.db_path}")
     else:
         print("\n❌ Arama sistemi çalıştırılamadı!")
 
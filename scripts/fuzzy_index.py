@@ -0,0 +1,314 @@
+import os
+import re
+import sqlite3
+
+# SymSpell tarzı silme sözlüğü: her terimin (prefix içindeki) 1..N karakter
+# silinmiş halleri önceden hesaplanır, sorgu anında sadece kelimenin kendi
+# silmeleri üretilip tabloda aranır. Levenshtein otomatı gerekmez.
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_TERM_LENGTH = 3
+SUGGESTION_LIMIT = 3
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Düzeltme sırasında dokunulmayan FTS5 sözdizimi: tırnaklı ifadeler, "kolon:" filtreleri,
+# prefix sorguları (kelime*), NEAR grupları ve operatörler. Sadece yalın kelimeler yeniden yazılır.
+QUERY_PATTERN = re.compile(
+    r'(?P<keep>"[^"]*"|\{[^}]*\}\s*:\s*\S*|\w+\s*:\s*\S*|\w+\*|NEAR\s*\([^)]*\))'
+    r'|(?P<word>\b[^\W\d_]+\b)',
+    re.UNICODE
+)
+QUERY_OPERATORS = {"AND", "OR", "NOT", "NEAR"}
+FTS_TOKEN_PATTERN = re.compile(r'"[^"]*"|[()]|[^\s()"]+')
+
+
+def tokenize(text):
+    """Metni küçük harfli terimlere böl (standard analyzer'a yakın)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def count_terms(text, frequencies=None):
+    """Metindeki terimleri say; verilen sözlük yerinde güncellenir"""
+    if frequencies is None:
+        frequencies = {}
+    for token in tokenize(text):
+        frequencies[token] = frequencies.get(token, 0) + 1
+    return frequencies
+
+
+def join_groups(query):
+    """FTS5 parantezli grupların yanında örtük AND kabul etmez; gereken yerlere AND ekle"""
+    tokens = list(FTS_TOKEN_PATTERN.finditer(query))
+    parts = []
+    last = 0
+    for previous, current in zip(tokens, tokens[1:]):
+        a, b = previous.group(), current.group()
+        if ((a == ')' and b != ')' and b not in QUERY_OPERATORS)
+                or (b == '(' and a != '(' and a not in QUERY_OPERATORS and not a.endswith(':'))):
+            parts.append(query[last:previous.end()] + ' AND')
+            last = previous.end()
+    parts.append(query[last:])
+    return ''.join(parts)
+
+
+def allowed_distance(word):
+    """Elasticsearch fuzziness AUTO ile aynı: ≤2 karakter 0, 3–5 karakter 1, daha uzun 2"""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def generate_deletes(word, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    """Kelimenin prefix'i üzerinden tüm silme varyantlarını üret"""
+    word = word[:prefix_length]
+    deletes = {word}
+    frontier = {word}
+
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in deletes:
+                    next_frontier.add(variant)
+        deletes |= next_frontier
+        frontier = next_frontier
+
+    return deletes
+
+
+def edit_distance(a, b, max_distance=MAX_EDIT_DISTANCE):
+    """Damerau-Levenshtein (OSA) mesafesi, eşik aşılırsa erken çık"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost
+            )
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+
+        if min(current) > max_distance:
+            return max_distance + 1
+
+        previous_previous, previous = previous, current
+
+    return previous[-1]
+
+
+class FuzzyTermIndex:
+    """Kelime hazinesi üzerinde önceden hesaplanmış silme sözlüğü (ayrı bir SQLite dosyasında)"""
+
+    def __init__(self, db_path, max_distance=MAX_EDIT_DISTANCE):
+        self.db_path = db_path
+        self.max_distance = max_distance
+
+    def setup(self, conn):
+        """Sözlük tablolarını (yeniden) oluştur"""
+        cursor = conn.cursor()
+        cursor.execute('DROP TABLE IF EXISTS vocab_terms')
+        cursor.execute('DROP TABLE IF EXISTS vocab_deletes')
+        self.create_tables(cursor)
+
+    def create_tables(self, cursor):
+        """Sözlük tablolarını yoksa oluştur"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vocab_terms (
+                term TEXT PRIMARY KEY,
+                freq INTEGER
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vocab_deletes (
+                deletion TEXT,
+                term TEXT,
+                PRIMARY KEY (deletion, term)
+            ) WITHOUT ROWID
+        ''')
+
+    def build(self, term_frequencies):
+        """(terim, frekans) çiftlerinden silme sözlüğünü oluştur"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        self.setup(conn)
+
+        term_count = 0
+        for term, freq in term_frequencies:
+            if len(term) < MIN_TERM_LENGTH or not term.isalpha():
+                continue
+
+            cursor.execute(
+                'INSERT OR REPLACE INTO vocab_terms (term, freq) VALUES (?, ?)',
+                (term, freq)
+            )
+            cursor.executemany(
+                'INSERT OR IGNORE INTO vocab_deletes (deletion, term) VALUES (?, ?)',
+                ((deletion, term) for deletion in generate_deletes(term, self.max_distance))
+            )
+            term_count += 1
+
+        conn.commit()
+        conn.close()
+
+        print(f"✓ Fuzzy sözlük oluşturuldu: {term_count} terim")
+        return term_count
+
+    def build_from_fts(self, source_db_path, fts_table):
+        """FTS5 tablosunun kelime hazinesini fts5vocab üzerinden oku ve sözlüğü oluştur"""
+        conn = sqlite3.connect(source_db_path)
+        cursor = conn.cursor()
+
+        # fts5vocab temp şemada açılır, kaynak veritabanına hiçbir şey yazılmaz
+        vocab_table = f"{fts_table}_vocab"
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS temp.{vocab_table}
+            USING fts5vocab(main, {fts_table}, 'row')
+        ''')
+        term_frequencies = cursor.execute(f'SELECT term, cnt FROM temp.{vocab_table}').fetchall()
+        conn.close()
+
+        return self.build(term_frequencies)
+
+    def build_from_texts(self, texts):
+        """Ham metinlerden frekans say ve sözlüğü oluştur (Elasticsearch tarafı için)"""
+        frequencies = {}
+        for text in texts:
+            count_terms(text, frequencies)
+
+        return self.build(frequencies.items())
+
+    def add_text(self, text):
+        """Yeni indexlenen dokümanın terimlerini sözlüğe ekle (akış halinde indexleme için)
+
+        Frekans, fts5vocab 'row' ile aynı şekilde terimin geçtiği doküman sayısıdır.
+        """
+        terms = {term for term in tokenize(text)
+                 if len(term) >= MIN_TERM_LENGTH and term.isalpha()}
+        if not terms:
+            return 0
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        self.create_tables(cursor)
+
+        new_terms = 0
+        for term in terms:
+            cursor.execute('UPDATE vocab_terms SET freq = freq + 1 WHERE term = ?', (term,))
+            if cursor.rowcount:
+                continue
+
+            cursor.execute('INSERT INTO vocab_terms (term, freq) VALUES (?, 1)', (term,))
+            cursor.executemany(
+                'INSERT OR IGNORE INTO vocab_deletes (deletion, term) VALUES (?, ?)',
+                ((deletion, term) for deletion in generate_deletes(term, self.max_distance))
+            )
+            new_terms += 1
+
+        conn.commit()
+        conn.close()
+        return new_terms
+
+    def clear(self):
+        """Sözlük dosyasını sil; yeniden oluşturulana kadar düzeltme yapılmaz"""
+        if self.exists():
+            os.remove(self.db_path)
+
+    def exists(self):
+        """Sözlük dosyası oluşturulmuş mu (yoksa düzeltme yapılmaz, dosya da yaratılmaz)"""
+        return os.path.exists(self.db_path)
+
+    def lookup(self, word, conn=None):
+        """Kelimeye en yakın gerçek terimleri döndür: [(terim, mesafe, frekans)]"""
+        word = word.lower()
+        own_conn = conn is None
+        if own_conn:
+            if not self.exists():
+                return []
+            conn = sqlite3.connect(self.db_path)
+
+        try:
+            cursor = conn.cursor()
+
+            row = cursor.execute('SELECT freq FROM vocab_terms WHERE term = ?', (word,)).fetchone()
+            if row:
+                return [(word, 0, row[0])]
+
+            max_distance = min(self.max_distance, allowed_distance(word))
+            if max_distance == 0:
+                return []
+
+            deletes = list(generate_deletes(word, max_distance))
+            placeholders = ','.join('?' * len(deletes))
+            cursor.execute(f'''
+                SELECT DISTINCT t.term, t.freq
+                FROM vocab_deletes d
+                JOIN vocab_terms t ON t.term = d.term
+                WHERE d.deletion IN ({placeholders})
+            ''', deletes)
+
+            suggestions = []
+            for term, freq in cursor.fetchall():
+                distance = edit_distance(word, term, max_distance)
+                if distance <= max_distance:
+                    suggestions.append((term, distance, freq))
+
+            suggestions.sort(key=lambda s: (s[1], -s[2], s[0]))
+            return suggestions
+
+        except sqlite3.OperationalError:
+            # Sözlük henüz oluşturulmamış
+            return []
+
+        finally:
+            if own_conn:
+                conn.close()
+
+    def correct(self, keyword, widen=False):
+        """Yalın kelimelerdeki yazım hatalarını düzelt; sorgu sözdizimi korunur
+
+        widen=False en yakın terimi kelimenin yerine yazar. widen=True orijinal
+        kelimeyi atmaz, önerilerle genişletir: (kelime OR öneri ...) — FTS5 sözdizimi.
+        """
+        if not self.exists():
+            return keyword
+
+        conn = sqlite3.connect(self.db_path)
+
+        def replace(match):
+            word = match.group('word')
+            if word is None or word in QUERY_OPERATORS or len(word) < MIN_TERM_LENGTH:
+                return match.group(0)
+
+            suggestions = self.lookup(word, conn)
+            if not suggestions or suggestions[0][1] == 0:
+                return word
+            if not widen:
+                return suggestions[0][0]
+
+            # Sözlük eski olsa bile tam eşleşmeler kaybolmaz (fuzziness AUTO gibi)
+            best = suggestions[0][1]
+            terms = [term for term, distance, _ in suggestions if distance == best]
+            return f"({' OR '.join([word] + terms[:SUGGESTION_LIMIT])})"
+
+        try:
+            corrected = QUERY_PATTERN.sub(replace, keyword)
+            if widen and corrected != keyword:
+                corrected = join_groups(corrected)
+            return corrected
+        finally:
+            conn.close()
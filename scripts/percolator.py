@@ -0,0 +1,200 @@
+import re
+import sqlite3
+
+# Sabit sorgular bir kez kaydedilir; her yeni doküman indexlenirken sorgu
+# terimlerinin ters indexi üzerinden eşleşen sorgular bulunur ve sonuçlar
+# query_matches tablosunda birikir. Özet rapor tüm korpusu yeniden aramaz.
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Metni küçük harfli terimlere böl"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class QueryPercolator:
+    """Standing query kayıtları, sorgu-terim ters indexi ve materyalize sonuçlar"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def setup(self, cursor):
+        """Tabloları yoksa oluştur (kayıtlı sorgular korunur)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS standing_queries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                keyword TEXT UNIQUE,
+                term_count INTEGER,
+                match_count INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_terms (
+                term TEXT,
+                query_id INTEGER,
+                PRIMARY KEY (term, query_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_matches (
+                query_id INTEGER,
+                doc_id TEXT,
+                title TEXT,
+                filename TEXT,
+                PRIMARY KEY (query_id, doc_id)
+            ) WITHOUT ROWID
+        ''')
+
+    def reset_matches(self, cursor):
+        """Korpus yeniden oluşturulurken birikmiş eşleşmeleri temizle"""
+        self.setup(cursor)
+        cursor.execute('DELETE FROM query_matches')
+        cursor.execute('UPDATE standing_queries SET match_count = 0')
+
+    def register(self, keywords, backfill=None):
+        """Sorguları kaydet ve mevcut korpusa karşı eşleştir; zaten kayıtlı olanlar atlanır
+
+        backfill(keyword) [(doc_id, başlık, dosya adı)] üretir. Verilmezse aynı
+        veritabanındaki documents_fts tablosu FTS5 MATCH ile taranır.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        self.setup(cursor)
+
+        registered = []
+        for keyword in keywords:
+            terms = set(tokenize(keyword))
+            cursor.execute(
+                'INSERT OR IGNORE INTO standing_queries (keyword, term_count) VALUES (?, ?)',
+                (keyword, len(terms))
+            )
+            if not cursor.rowcount:
+                continue
+
+            query_id = cursor.lastrowid
+            cursor.executemany(
+                'INSERT OR IGNORE INTO query_terms (term, query_id) VALUES (?, ?)',
+                ((term, query_id) for term in terms)
+            )
+            registered.append((query_id, keyword, terms))
+
+        # Kayıttan önce indexlenmiş dokümanlar da sonuçlara eklenir
+        backfilled = 0
+        for query_id, keyword, terms in registered:
+            docs = backfill(keyword) if backfill else self.search_fts(cursor, terms)
+            for doc_id, title, filename in docs:
+                self.record(cursor, [query_id], doc_id, title, filename)
+                backfilled += 1
+
+        conn.commit()
+        conn.close()
+
+        print(f"✓ {len(registered)} standing query kaydedildi ({backfilled} mevcut eşleşme)")
+        return len(registered)
+
+    def search_fts(self, cursor, terms):
+        """Terimlerin hepsini içeren mevcut dokümanlar (documents_fts yoksa boş)"""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'documents_fts'"
+        ).fetchone()
+        if not exists or not terms:
+            return []
+
+        # Tırnaklı terimler arasındaki boşluk FTS5'te örtük AND'dir
+        match = ' '.join(f'"{term}"' for term in sorted(terms))
+        return cursor.execute('''
+            SELECT d.id, d.title, d.filename
+            FROM documents_fts
+            JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+        ''', (match,)).fetchall()
+
+    def keywords(self):
+        """Kayıtlı sorgu metinleri"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.setup(conn.cursor())
+            return [row[0] for row in conn.execute('SELECT keyword FROM standing_queries ORDER BY id')]
+        finally:
+            conn.close()
+
+    def match(self, cursor, title, content):
+        """Dokümanla eşleşen sorguların id'lerini döndür (tüm terimler geçmeli, FTS5 AND gibi)"""
+        doc_terms = set(tokenize(f"{title} {content}"))
+        if not doc_terms:
+            return []
+
+        # Ters indexten, dokümanda geçen terimlerin kaç tanesini içerdiğine göre aday sorgular
+        terms = list(doc_terms)
+        hits = {}
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for query_id, count in cursor.execute(f'''
+                SELECT query_id, COUNT(*) FROM query_terms
+                WHERE term IN ({placeholders})
+                GROUP BY query_id
+            ''', chunk):
+                hits[query_id] = hits.get(query_id, 0) + count
+
+        if not hits:
+            return []
+
+        placeholders = ','.join('?' * len(hits))
+        cursor.execute(
+            f'SELECT id, term_count FROM standing_queries WHERE id IN ({placeholders})',
+            list(hits)
+        )
+        return [query_id for query_id, term_count in cursor.fetchall() if hits[query_id] == term_count]
+
+    def record(self, cursor, query_ids, doc_id, title, filename):
+        """Eşleşmeleri materyalize sonuç tablosuna ekle"""
+        for query_id in query_ids:
+            cursor.execute('''
+                INSERT OR IGNORE INTO query_matches (query_id, doc_id, title, filename)
+                VALUES (?, ?, ?, ?)
+            ''', (query_id, str(doc_id), title, filename))
+            if cursor.rowcount:
+                cursor.execute(
+                    'UPDATE standing_queries SET match_count = match_count + 1 WHERE id = ?',
+                    (query_id,)
+                )
+
+    def record_keywords(self, cursor, keywords, doc_id, title, filename):
+        """Sorgu metinleriyle eşleşme kaydet (Elasticsearch percolator sonuçları için)"""
+        query_ids = []
+        for keyword in keywords:
+            row = cursor.execute('SELECT id FROM standing_queries WHERE keyword = ?', (keyword,)).fetchone()
+            if row:
+                query_ids.append(row[0])
+        self.record(cursor, query_ids, doc_id, title, filename)
+
+    def percolate(self, cursor, doc_id, title, content, filename):
+        """Yeni dokümanı tüm standing query'lere karşı eşleştir ve kaydet"""
+        query_ids = self.match(cursor, title, content)
+        self.record(cursor, query_ids, doc_id, title, filename)
+        return query_ids
+
+    def summary(self):
+        """{sorgu: eşleşme sayısı} — sayılar ingest sırasında tutulduğu için arama yapılmaz"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.setup(conn.cursor())
+            return dict(conn.execute('SELECT keyword, match_count FROM standing_queries'))
+        finally:
+            conn.close()
+
+    def matches(self, keyword):
+        """Sorgunun materyalize edilmiş sonuçları: [(başlık, dosya adı)]"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.setup(conn.cursor())
+            return conn.execute('''
+                SELECT m.title, m.filename
+                FROM query_matches m
+                JOIN standing_queries q ON q.id = m.query_id
+                WHERE q.keyword = ?
+            ''', (keyword,)).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,270 @@
+import os
+import json
+import sqlite3
+import argparse
+import threading
+import queue
+import time
+
+import wikipedia_scraper as scraper
+from elastic_search import WikipediaPDFSearcher
+from dedup import MinHashDeduplicator
+
+# fetch → clean → dedup → (pdf → extract) → index aşamaları sınırlı kuyruklarla bağlanır.
+# Kuyruk dolduğunda üretici bekler, böylece indexleyici geride kalırsa
+# fetch otomatik olarak yavaşlar (backpressure).
+QUEUE_SIZE = 8
+CHECKPOINT_PATH = "pipeline_checkpoint.json"
+
+_STOP = object()
+
+
+class Checkpoint:
+    """Tamamlanan arama terimlerini diske yazar, yarıda kalan çalışma buradan devam eder"""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = set()
+
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.done = set(json.load(f).get("done", []))
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def mark(self, term):
+        """Terimi tamamlandı olarak işaretle (atomik yazma)"""
+        with self.lock:
+            self.done.add(term)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"done": sorted(self.done)}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
+
+
+class ScrapePipeline:
+    """Wikipedia'dan çekilen makaleleri akış halinde SQLite FTS5'e indexler"""
+
+    def __init__(self, searcher=None, make_pdf=False, fetch_workers=2,
+                 clean_workers=1, pdf_workers=2, checkpoint_path=CHECKPOINT_PATH,
+                 fetch_delay=1.0):
+        self.searcher = searcher or WikipediaPDFSearcher()
+        self.make_pdf = make_pdf
+        self.fetch_workers = fetch_workers
+        self.clean_workers = clean_workers
+        self.pdf_workers = pdf_workers
+        self.fetch_delay = fetch_delay
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.deduplicator = MinHashDeduplicator()
+        self.indexed_count = 0
+        self.duplicate_count = 0
+
+    # --- Aşamalar ---------------------------------------------------------
+
+    def fetch(self, item):
+        """Terimi Wikipedia'da ara ve makaleyi indir"""
+        number, term = item
+        print(f"[{number}] '{term}' aranıyor...")
+
+        # Geçici hatalarda (ağ, zaman aşımı, 429/5xx) FetchError yükselir ve terim
+        # checkpoint'e yazılmaz; devam eden çalışmada yeniden denenir
+        try:
+            article = scraper.fetch_article(term)
+        finally:
+            # API'yi yormamak için her worker kendi isteklerini aralıklandırır
+            time.sleep(self.fetch_delay)
+
+        if not article:
+            self.checkpoint.mark(term)
+            return None
+
+        title, content = article
+        return {"number": number, "term": term, "title": title, "content": content}
+
+    def clean(self, doc):
+        """İçeriği satır satır temizle"""
+        lines = [scraper.clean_text(line) for line in doc["content"].split('\n')]
+        doc["content"] = '\n'.join(line for line in lines if line)
+        doc["filename"] = scraper.make_filename(doc["number"], doc["title"])
+        return doc
+
+    def dedup(self, doc):
+        """Daha önce görülen makalenin (neredeyse) aynısıysa PDF/index öncesi düşür"""
+        duplicate = self.deduplicator.add(doc["term"], doc["content"])
+        if duplicate:
+            print(f"  ⧉ '{doc['term']}' yineleniyor ('{duplicate}'), atlandı")
+            self.duplicate_count += 1
+            self.checkpoint.mark(doc["term"])
+            return None
+        return doc
+
+    def render_and_extract(self, doc):
+        """PDF oluştur ve metni PDF'ten geri çıkar (indexler ile aynı metin)"""
+        if not scraper.create_pdf(doc["title"], doc["content"], doc["filename"]):
+            print(f"  -> ✗ PDF oluşturulamadı: {doc['filename']}")
+            return doc
+
+        pdf_path = os.path.join(scraper.output_dir, doc["filename"])
+        content, page_count = self.searcher.extract_text_from_pdf(pdf_path)
+        if content:
+            doc["content"] = content
+            doc["page_count"] = page_count
+        return doc
+
+    def index(self, conn, doc):
+        """Dokümanı kaydet ve hemen commit et (saniyeler içinde aranabilir olur)"""
+        cursor = conn.cursor()
+        content = ' '.join(doc["content"].split())
+        self.searcher.index_document(
+            cursor, doc["title"], content, doc["filename"], doc.get("page_count", 0)
+        )
+        conn.commit()
+
+        # Yeni terimler sözlüğe hemen eklenir, aramalarda yanlış düzeltilmez
+        self.searcher.fuzzy_index.add_text(f"{doc['title']} {content}")
+
+        self.checkpoint.mark(doc["term"])
+        self.indexed_count += 1
+        print(f"  ✓ İndexlendi: {doc['title']}")
+
+    # --- Altyapı ----------------------------------------------------------
+
+    def _worker(self, func, in_queue, out_queue):
+        while True:
+            item = in_queue.get()
+            if item is _STOP:
+                break
+            try:
+                result = func(item)
+            except Exception as e:
+                print(f"  ✗ Aşama hatası ({func.__name__}): {e}")
+                result = None
+            if result is not None:
+                out_queue.put(result)
+
+    def _start_stage(self, func, in_queue, out_queue, workers, next_workers):
+        """Aşamayı kendi worker sayısıyla başlat, bitince sonraki aşamaya STOP gönder"""
+        threads = [
+            threading.Thread(target=self._worker, args=(func, in_queue, out_queue), daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        def close():
+            for thread in threads:
+                thread.join()
+            for _ in range(next_workers):
+                out_queue.put(_STOP)
+
+        closer = threading.Thread(target=close, daemon=True)
+        closer.start()
+        return closer
+
+    def load_existing(self):
+        """Devam eden çalışmada önceden indexlenmiş dokümanları yineleme kontrolüne ekle"""
+        conn = sqlite3.connect(self.searcher.db_path)
+        try:
+            cursor = conn.cursor()
+            dict_id_column = self.searcher.dict_id_column(cursor)
+            rows = cursor.execute(f'SELECT filename, content, {dict_id_column} FROM documents').fetchall()
+            for filename, content, dict_id in rows:
+                self.deduplicator.add(filename, self.searcher.decode_content(cursor, content, dict_id))
+        finally:
+            conn.close()
+
+    def run(self, terms, resume=True):
+        """Pipeline'ı çalıştır; resume=False ise checkpoint ve veritabanı sıfırlanır"""
+        if not resume or not self.checkpoint.exists():
+            self.checkpoint.clear()
+            if not self.searcher.setup_database():
+                return False
+        else:
+            self.load_existing()
+
+        pending = [
+            (number, term) for number, term in enumerate(terms, 1)
+            if term not in self.checkpoint.done
+        ]
+        print(f"📋 {len(pending)}/{len(terms)} terim işlenecek")
+
+        term_queue = queue.Queue()
+        fetched_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        cleaned_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        unique_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        extracted_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+        for item in pending:
+            term_queue.put(item)
+        for _ in range(self.fetch_workers):
+            term_queue.put(_STOP)
+
+        self._start_stage(self.fetch, term_queue, fetched_queue,
+                          self.fetch_workers, self.clean_workers)
+
+        self._start_stage(self.clean, fetched_queue, cleaned_queue,
+                          self.clean_workers, 1)
+
+        # Yineleme kontrolü durum tuttuğu için tek worker ile çalışır
+        if self.make_pdf:
+            self._start_stage(self.dedup, cleaned_queue, unique_queue, 1, self.pdf_workers)
+            self._start_stage(self.render_and_extract, unique_queue, extracted_queue,
+                              self.pdf_workers, 1)
+        else:
+            self._start_stage(self.dedup, cleaned_queue, extracted_queue, 1, 1)
+
+        # SQLite tek yazıcı ister; indexleme ana thread'de yapılır
+        conn = sqlite3.connect(self.searcher.db_path)
+        try:
+            while True:
+                doc = extracted_queue.get()
+                if doc is _STOP:
+                    break
+                try:
+                    self.index(conn, doc)
+                except Exception as e:
+                    print(f"  ✗ İndexleme hatası ({doc['title']}): {e}")
+        finally:
+            conn.close()
+
+        self.searcher.fuzzy_index.build_from_fts(self.searcher.db_path, 'documents_fts')
+        self.searcher.train_compression()
+
+        print(f"\n📊 Pipeline tamamlandı: {self.indexed_count} yeni doküman indexlendi")
+        if self.duplicate_count:
+            print(f"⧉ {self.duplicate_count} yinelenen makale atlandı")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wikipedia scrape → index akış pipeline'ı")
+    parser.add_argument("--pdf", action="store_true", help="Ara adımda PDF oluştur ve metni PDF'ten çıkar")
+    parser.add_argument("--fetch-workers", type=int, default=2)
+    parser.add_argument("--clean-workers", type=int, default=1)
+    parser.add_argument("--pdf-workers", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=50, help="İşlenecek terim sayısı")
+    parser.add_argument("--restart", action="store_true", help="Checkpoint'i yok say ve baştan başla")
+    args = parser.parse_args()
+
+    pipeline = ScrapePipeline(
+        make_pdf=args.pdf,
+        fetch_workers=args.fetch_workers,
+        clean_workers=args.clean_workers,
+        pdf_workers=args.pdf_workers
+    )
+
+    if pipeline.run(scraper.search_terms[:args.limit], resume=not args.restart):
+        print(f"\n✅ Veritabanı: {pipeline.searcher.db_path}")
+    else:
+        print("\n❌ Pipeline çalıştırılamadı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import requests
 import os
-from fpdf import FPDF
 import re
 import time
 
@@ -9,10 +8,11 @@ HEADERS = {
     'User-Agent': 'WikipediaPDFScraper/1.0 (https://example.com/contact) Python/requests'
 }
 
-# Gerekli klasörü oluştur
+# PDF'lerin kaydedileceği klasör (ilk PDF yazılırken oluşturulur)
 output_dir = "wikipedia_pdfs"
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+
+class FetchError(Exception):
+    """Geçici hata (ağ, zaman aşımı, 429/5xx): terim daha sonra yeniden denenmeli"""
 
 # Data & Cloud Technologies ile ilgili arama terimleri - daha spesifik
 search_terms = [
@@ -86,8 +86,7 @@ def search_wikipedia_simple(term):
             return try_direct_rest_api(term)
             
         if search_response.status_code != 200:
-            print(f"  -> Search API hatası: {search_response.status_code}")
-            return None
+            raise FetchError(f"Search API hatası: {search_response.status_code}")
             
         search_data = search_response.json()
         
@@ -116,9 +115,8 @@ def search_wikipedia_simple(term):
                 'extract': f"Wikipedia article about {page_title}"
             }
             
-    except Exception as e:
-        print(f"  -> Hata: {e}")
-        return None
+    except (requests.RequestException, ValueError, KeyError) as e:
+        raise FetchError(f"Arama isteği başarısız: {e}") from e
 
 def try_direct_rest_api(term):
     """Direkt REST API ile deneme"""
@@ -139,13 +137,14 @@ def try_direct_rest_api(term):
                 if data.get('type') != 'disambiguation':
                     print(f"  -> ✓ Direkt bulundu: {variant}")
                     return data
+            elif response.status_code == 429 or response.status_code >= 500:
+                raise FetchError(f"REST API hatası: {response.status_code}")
         
         print(f"  -> Direkt yöntem de başarısız")
         return None
         
-    except Exception as e:
-        print(f"  -> Direkt API hatası: {e}")
-        return None
+    except (requests.RequestException, ValueError, KeyError) as e:
+        raise FetchError(f"Direkt API hatası: {e}") from e
 
 def get_full_article(title):
     """Tam makale içeriğini al"""
@@ -160,20 +159,58 @@ def get_full_article(title):
             'exsectionformat': 'plain'
         }
         response = requests.get(url, params=params, headers=HEADERS, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
-            pages = data['query']['pages']
-            for page_id in pages:
-                if 'extract' in pages[page_id]:
-                    return pages[page_id]['extract']
+        if response.status_code != 200:
+            raise FetchError(f"Tam makale alınamadı: {response.status_code}")
+        
+        data = response.json()
+        pages = data['query']['pages']
+        for page_id in pages:
+            if 'extract' in pages[page_id]:
+                return pages[page_id]['extract']
         return None
-    except Exception as e:
-        print(f"  -> Tam makale alınamadı: {e}")
+    except (requests.RequestException, ValueError, KeyError) as e:
+        raise FetchError(f"Tam makale alınamadı: {e}") from e
+
+def make_filename(number, title):
+    """Sıra numarası ve başlıktan güvenli PDF dosya adı oluştur"""
+    safe_filename = re.sub(r'[^\w\s-]', '', title)
+    safe_filename = re.sub(r'[-\s]+', '-', safe_filename)
+    return f"{number:02d}_{safe_filename[:50]}.pdf"
+
+def fetch_article(term):
+    """Terimi ara ve (başlık, içerik) döndür; bulunamazsa None
+    
+    Geçici hatalarda FetchError yükselir (None kesin "sonuç yok" demektir).
+    """
+    summary = search_wikipedia_simple(term)
+    
+    if not summary or 'title' not in summary:
+        print(f"  -> ✗ Sonuç bulunamadı: {term}")
         return None
+    
+    title = summary['title']
+    print(f"  -> ✓ Bulundu: {title}")
+    
+    # Tam makaleyi al
+    full_content = get_full_article(title)
+    
+    if not full_content and 'extract' in summary:
+        # Eğer tam makale alınamazsa özet kullan
+        full_content = summary['extract']
+        print(f"  -> Tam makale yerine özet kullanılıyor")
+    
+    if not full_content:
+        print(f"  -> ✗ İçerik alınamadı: {title}")
+        return None
+    
+    return title, full_content
 
 def create_pdf(title, content, filename):
     """PDF oluştur"""
+    from fpdf import FPDF
+    
     try:
+        os.makedirs(output_dir, exist_ok=True)
         pdf = FPDF()
         pdf.add_page()
         
@@ -235,37 +272,25 @@ def main():
     for i, term in enumerate(search_terms[:50]):  # İlk 50 terimi al
         print(f"\n[{i+1}/50] '{term}' aranıyor...")
         
-        # Wikipedia'da ara
-        summary = search_wikipedia_simple(term)
+        # Wikipedia'da ara ve makaleyi al
+        try:
+            article = fetch_article(term)
+        except FetchError as e:
+            print(f"  -> ✗ Geçici hata, atlandı: {e}")
+            article = None
         
-        if summary and 'title' in summary:
-            title = summary['title']
-            print(f"  -> ✓ Bulundu: {title}")
+        if article:
+            title, full_content = article
             
-            # Tam makaleyi al
-            full_content = get_full_article(title)
+            # Dosya adını oluştur
+            filename = make_filename(i + 1, title)
             
-            if not full_content and 'extract' in summary:
-                # Eğer tam makale alınamazsa özet kullan
-                full_content = summary['extract']
-                print(f"  -> Tam makale yerine özet kullanılıyor")
-            
-            if full_content:
-                # Dosya adını oluştur
-                safe_filename = re.sub(r'[^\w\s-]', '', title)
-                safe_filename = re.sub(r'[-\s]+', '-', safe_filename)
-                filename = f"{i+1:02d}_{safe_filename[:50]}.pdf"
-                
-                # PDF oluştur
-                if create_pdf(title, full_content, filename):
-                    print(f"  -> ✓ PDF oluşturuldu: {filename}")
-                    successful_downloads += 1
-                else:
-                    print(f"  -> ✗ PDF oluşturulamadı: {filename}")
+            # PDF oluştur
+            if create_pdf(title, full_content, filename):
+                print(f"  -> ✓ PDF oluşturuldu: {filename}")
+                successful_downloads += 1
             else:
-                print(f"  -> ✗ İçerik alınamadı: {title}")
-        else:
-            print(f"  -> ✗ Sonuç bulunamadı: {term}")
+                print(f"  -> ✗ PDF oluşturulamadı: {filename}")
         
         # API'yi yormamak için kısa bekleme
         time.sleep(1)  # 403 hatalarını önlemek için biraz daha bekle